@@ -0,0 +1,31 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional: run the same kernel as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+
+# Prefix-sum form on ascending-sorted values:
+#   G = (n + 1 - 2 * sum_i(cs_i) / cs_n) / n,  cs = cumsum(a)
+# Compiled once and cached on disk (__pycache__), so repeated runs skip the JIT.
+@njit(cache=True, fastmath=True)
+def _gini_loop(a: np.ndarray) -> float:
+    a = np.sort(a)
+    n = a.shape[0]
+    s = 0.0
+    acc = 0.0
+    for i in range(n):
+        s += a[i]
+        acc += s
+    if n == 0 or s <= 0:
+        return 0.0
+    return (n + 1 - 2.0 * acc / s) / n
+
+
+def gini_kernel(a: np.ndarray) -> float:
+    """Gini coefficient of a 1-D float64 array of nonnegative values."""
+    return float(_gini_loop(np.ascontiguousarray(a, dtype=np.float64)))
@@ -0,0 +1,436 @@
+import hashlib
+import os
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional: run the same kernels as plain Python/NumPy
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+
+# Numeric core of one simulation timestep on supplier-aligned arrays.
+# No fastmath: the fairness/allocation loop is sensitive to rounding, so every
+# reduction that feeds back into it is left-to-right (see ordered_sum).
+
+
+# Scratch buffers of length N, allocated once per run and overwritten every
+# timestep; kernels work on the leading `m` entries for m eligible suppliers.
+Workspace = namedtuple("Workspace", ["idx", "scores", "w", "q", "cap", "tmp", "taken"])
+
+
+@njit(cache=True)
+def make_workspace(n):
+    return Workspace(np.empty(n, np.int64), np.empty(n), np.empty(n), np.empty(n), np.empty(n), np.empty(n),
+                     np.empty(n, np.bool_))
+
+
+# Sequential allocation picks suppliers one at a time by scanning for the next
+# best score; past this many picks the remaining order comes from a full sort.
+LAZY_PICKS = 4
+
+
+@njit(cache=True)
+def ordered_sum(x):
+    """
+    Left-to-right sum, matching a plain Python loop bit for bit with or
+    without numba (np.sum switches to pairwise order from 8+ elements).
+    """
+    total = 0.0
+    for v in x:
+        total += v
+    return total
+
+
+@njit(cache=True)
+def compute_scores(c_prime, co2, F_unified, idx, w_c, w_e, w_f, eps, scores):
+    """
+    Score_s for the suppliers at `idx`, written to `scores` (aligned with `idx`,
+    lower is better). Pass w_f = 0 when fairness is disabled.
+    """
+    n = idx.shape[0]
+    if n == 0:
+        return scores
+
+    # Column minima and min-max denominators in one pass
+    i = idx[0]
+    cmin = cmax = c_prime[i]
+    emin = emax = co2[i]
+    fmin = fmax = F_unified[i]
+    for j in range(1, n):
+        i = idx[j]
+        cmin = min(cmin, c_prime[i])
+        cmax = max(cmax, c_prime[i])
+        emin = min(emin, co2[i])
+        emax = max(emax, co2[i])
+        fmin = min(fmin, F_unified[i])
+        fmax = max(fmax, F_unified[i])
+    cden = (cmax - cmin) + eps
+    eden = (emax - emin) + eps
+    fden = (fmax - fmin) + eps
+
+    # Weighted sum of the normalized columns in a second pass
+    for j in range(n):
+        i = idx[j]
+        scores[j] = (w_c * ((c_prime[i] - cmin) / cden) + w_e * ((co2[i] - emin) / eden)
+                     + w_f * ((F_unified[i] - fmin) / fden))
+    return scores
+
+
+@njit(cache=True)
+def allocate_sequential(ranked, cap_available, demand, alloc):
+    """Fill `alloc` along `ranked`: q = min(D_b, Cap_s). Returns the unmet demand."""
+    for i in ranked:
+        if demand <= 0:
+            break
+        if cap_available[i] <= 0:
+            continue
+        q = min(demand, cap_available[i])
+        alloc[i] = q
+        cap_available[i] -= q
+        demand -= q
+    return demand
+
+
+@njit(cache=True)
+def allocate_sequential_lazy(scores, idx, cap_available, demand, alloc, taken):
+    """
+    Same result as allocate_sequential(idx[stable argsort(scores)], ...), but
+    only ranks as many suppliers as the demand needs: usually one or two
+    O(m) argmin scans instead of an O(m log m) sort. Ties go to the earlier
+    entry of `idx`, as in the stable sort. `taken`: (m,) scratch buffer.
+    """
+    m = idx.shape[0]
+    taken[:] = False
+    picks = 0
+    while demand > 0 and picks < m:
+        if picks == LAZY_PICKS:
+            rest = np.nonzero(~taken)[0]
+            ranked = idx[rest[np.argsort(scores[rest], kind="mergesort")]]
+            return allocate_sequential(ranked, cap_available, demand, alloc)
+
+        best = -1
+        for j in range(m):
+            if not taken[j] and (best < 0 or scores[j] < scores[best]):
+                best = j
+        taken[best] = True
+        picks += 1
+
+        i = idx[best]
+        if cap_available[i] <= 0:
+            continue
+        q = min(demand, cap_available[i])
+        alloc[i] = q
+        cap_available[i] -= q
+        demand -= q
+    return demand
+
+
+@njit(cache=True)
+def allocate_proportional(scores, idx, cap_available, demand, alloc, w, q, cap, max_passes=3):
+    """
+    Fill `alloc` with shares of inverse-score weights, q = min(share, Cap_s).
+    Suppliers scoring 0 (the best one after min-max normalization) get no
+    weight in the first pass, as in the original rule weight_s = 1 / Score_s
+    for Score_s > 0. Demand left over by capacity-limited suppliers is placed
+    in further passes (up to `max_passes` in total): first split evenly over
+    score-0 suppliers with capacity left (the limit of their infinite weight),
+    then shared by inverse-score weight among the others with capacity left.
+    Returns the unmet demand. w, q, cap: scratch buffers aligned with `idx`.
+    """
+    m = idx.shape[0]
+    demand_in = demand
+    for p in range(max_passes):
+        if p > 0:
+            n_best = 0
+            for j in range(m):
+                if scores[j] <= 0 and cap_available[idx[j]] > 0:
+                    n_best += 1
+            if n_best > 0:
+                share = demand / n_best
+                for j in range(m):
+                    i = idx[j]
+                    if scores[j] <= 0 and cap_available[i] > 0:
+                        qj = min(share, cap_available[i])
+                        alloc[i] += qj
+                        cap_available[i] -= qj
+                        demand -= qj
+                if demand <= 1e-9 * demand_in:
+                    return 0.0
+
+        for j in range(m):
+            cap[j] = cap_available[idx[j]]
+            w[j] = 1.0 / scores[j] if scores[j] > 0 and cap[j] > 0 else 0.0
+        total_w = ordered_sum(w)
+        if total_w == 0:
+            if p == 0:
+                break               # no positive score to weight by: nothing allocated
+            continue
+
+        np.divide(w, total_w, q)
+        np.multiply(q, demand, q)
+        np.minimum(q, cap, q)
+        for j in range(m):
+            alloc[idx[j]] += q[j]
+            cap_available[idx[j]] = cap[j] - q[j]
+        demand -= ordered_sum(q)
+        if demand <= 1e-9 * demand_in:    # only rounding residue left
+            return 0.0
+    return demand
+
+
+@njit(cache=True)
+def update_fairness(alloc, Q, rot_wait, F_rot, F_disp, F_unified, cap_nominal, delta, eps, disp_cap, tmp):
+    """Fairness state update in place; `tmp` is an (N,) scratch buffer."""
+    # Q_s and rotation (r_s, F^rot)
+    np.add(Q, alloc, Q)
+    for i in range(rot_wait.shape[0]):
+        rot_wait[i] = 0 if alloc[i] > 0 else rot_wait[i] + 1
+    np.add(rot_wait, 1.0, F_rot)
+    np.divide(1.0, F_rot, F_rot)
+
+    # Disparity H_s / E_s, capped
+    total_Q = ordered_sum(Q)
+    total_Cap = ordered_sum(cap_nominal)
+    if total_Q <= eps or total_Cap <= eps:
+        F_disp[:] = 1.0
+    else:
+        np.divide(Q, total_Q + eps, F_disp)
+        np.divide(cap_nominal, total_Cap + eps, tmp)
+        np.add(tmp, eps, tmp)
+        np.divide(F_disp, tmp, F_disp)
+        np.clip(F_disp, eps, disp_cap, F_disp)
+
+    # F_s = delta * F^rot + (1 - delta) * F^disp
+    np.multiply(F_rot, delta, F_unified)
+    np.multiply(F_disp, 1.0 - delta, tmp)
+    np.add(F_unified, tmp, F_unified)
+
+
+@njit(cache=True)
+def compute_emissions(alloc, co2, trans_per_unit):
+    """(CO2_prod, CO2_trans) for one timestep's allocation vector."""
+    co2_prod = 0.0
+    co2_trans = 0.0
+    for i in range(alloc.shape[0]):
+        co2_prod += alloc[i] * co2[i]
+        co2_trans += alloc[i] * trans_per_unit[i]
+    return co2_prod, co2_trans
+
+
+@njit(cache=True)
+def compute_cost_total(alloc, c_prime):
+    total = 0.0
+    for i in range(alloc.shape[0]):
+        total += alloc[i] * c_prime[i]
+    return total
+
+
+@njit(cache=True)
+def _step(c_prime, co2, trans_per_unit, cap_nominal, cap_available, Q, rot_wait, F_rot, F_disp, F_unified,
+          demand_nominal, w_c, w_e, w_f, delta, use_fairness, eps, disp_cap, sequential,
+          ws, alloc, emissions, fairness):
+    """
+    One timestep. Fills `alloc` (N,), `emissions` (CO2_prod, CO2_trans, CO2_total)
+    and `fairness` (N, 4); returns (cost, unmet demand). `ws` is a Workspace.
+    """
+    # 1) Refresh capacities and demand
+    cap_available[:] = cap_nominal
+    demand = demand_nominal
+
+    # 2) Filtering
+    m = 0
+    for i in range(cap_available.shape[0]):
+        if cap_available[i] > 0:
+            ws.idx[m] = i
+            m += 1
+    idx = ws.idx[:m]
+
+    # 3) Allocation
+    scores = compute_scores(c_prime, co2, F_unified, idx, w_c, w_e, w_f, eps, ws.scores[:m])
+    if sequential:
+        demand = allocate_sequential_lazy(scores, idx, cap_available, demand, alloc, ws.taken[:m])
+    else:
+        demand = allocate_proportional(scores, idx, cap_available, demand, alloc, ws.w[:m], ws.q[:m], ws.cap[:m])
+
+    # 4) Fairness update (only if enabled)
+    if use_fairness:
+        update_fairness(alloc, Q, rot_wait, F_rot, F_disp, F_unified, cap_nominal, delta, eps, disp_cap, ws.tmp)
+
+    # 5) Emissions and cost
+    co2_prod, co2_trans = compute_emissions(alloc, co2, trans_per_unit)
+    emissions[0] = co2_prod
+    emissions[1] = co2_trans
+    emissions[2] = co2_prod + co2_trans
+
+    fairness[:, 0] = Q
+    fairness[:, 1] = F_rot
+    fairness[:, 2] = F_disp
+    fairness[:, 3] = F_unified
+    return compute_cost_total(alloc, c_prime), demand
+
+
+@njit(cache=True)
+def _run(c, co2, cap_nominal, cap_available, dist, Q, rot_wait, F_rot, F_disp, F_unified,
+         demand_nominal, tau, w_c, w_e, w_f, delta, use_fairness, co2_per_km, eps, disp_cap,
+         T, sequential):
+    n = c.shape[0]
+    alloc_hist = np.zeros((T, n))
+    emissions = np.empty((T, 3))
+    cost = np.empty(T)
+    fairness = np.empty((T, n, 4))     # Q, F_rot, F_disp, F_unified after each step
+    demand = demand_nominal
+
+    # Per-supplier constants for the run: c'_s = c_s + tau * CO2_s and d_sb * co2_per_km
+    c_prime = c + tau * co2
+    trans_per_unit = dist * co2_per_km
+    ws = make_workspace(n)
+
+    # Fairness off: F stays neutral and carries no weight in the score
+    if not use_fairness:
+        w_f = 0.0
+        F_rot[:] = 1.0
+        F_disp[:] = 1.0
+        F_unified[:] = 1.0
+
+    for t in range(T):
+        cost[t], demand = _step(
+            c_prime, co2, trans_per_unit, cap_nominal, cap_available, Q, rot_wait, F_rot, F_disp, F_unified,
+            demand_nominal, w_c, w_e, w_f, delta, use_fairness, eps, disp_cap, sequential,
+            ws, alloc_hist[t], emissions[t], fairness[t],
+        )
+
+    return alloc_hist, emissions, cost, fairness, demand
+
+
+@njit(cache=True)
+def run_batched(c, co2, cap_nominal, cap_available, dist, Q, rot_wait, F_rot, F_disp, F_unified,
+                demand_nominal, tau, w_c, w_e, w_f, delta, use_fairness, co2_per_km, eps, disp_cap,
+                T, sequential):
+    """
+    S scenarios sharing one allocation mode, advanced together timestep by timestep.
+    co2 and the supplier state arrays are (S, N), scenario parameters are (S,);
+    returns the _run outputs stacked over a leading S axis.
+    """
+    S, n = co2.shape
+    alloc_hist = np.zeros((S, T, n))
+    emissions = np.empty((S, T, 3))
+    cost = np.empty((S, T))
+    fairness = np.empty((S, T, n, 4))
+    demand = np.full(S, demand_nominal)
+
+    c_prime = np.empty((S, n))
+    trans_per_unit = dist * co2_per_km
+    ws = make_workspace(n)                 # scenarios run one after another within a timestep
+    w_f_eff = w_f.copy()
+    for k in range(S):
+        c_prime[k] = c + tau[k] * co2[k]
+        if not use_fairness[k]:
+            w_f_eff[k] = 0.0
+            F_rot[k, :] = 1.0
+            F_disp[k, :] = 1.0
+            F_unified[k, :] = 1.0
+
+    for t in range(T):
+        for k in range(S):
+            cost[k, t], demand[k] = _step(
+                c_prime[k], co2[k], trans_per_unit, cap_nominal, cap_available[k],
+                Q[k], rot_wait[k], F_rot[k], F_disp[k], F_unified[k],
+                demand_nominal, w_c[k], w_e[k], w_f_eff[k], delta[k], use_fairness[k], eps, disp_cap,
+                sequential, ws, alloc_hist[k, t], emissions[k, t], fairness[k, t],
+            )
+
+    return alloc_hist, emissions, cost, fairness, demand
+
+
+@njit(cache=True)
+def run_sequential(c, co2, cap_nominal, cap_available, dist, Q, rot_wait, F_rot, F_disp, F_unified,
+                   demand_nominal, tau, w_c, w_e, w_f, delta, use_fairness, co2_per_km, eps, disp_cap, T):
+    """Whole run with ranked sequential allocation; supplier state arrays are updated in place."""
+    return _run(c, co2, cap_nominal, cap_available, dist, Q, rot_wait, F_rot, F_disp, F_unified,
+                demand_nominal, tau, w_c, w_e, w_f, delta, use_fairness, co2_per_km, eps, disp_cap,
+                T, True)
+
+
+@njit(cache=True)
+def run_proportional(c, co2, cap_nominal, cap_available, dist, Q, rot_wait, F_rot, F_disp, F_unified,
+                     demand_nominal, tau, w_c, w_e, w_f, delta, use_fairness, co2_per_km, eps, disp_cap, T):
+    """Whole run with inverse-score proportional allocation; supplier state arrays are updated in place."""
+    return _run(c, co2, cap_nominal, cap_available, dist, Q, rot_wait, F_rot, F_disp, F_unified,
+                demand_nominal, tau, w_c, w_e, w_f, delta, use_fairness, co2_per_km, eps, disp_cap,
+                T, False)
+
+
+# Ahead-of-time build: `python _kernels.py` writes an ecofair_kernels extension
+# module next to this file, plus a sidecar with the hash of this file's source.
+# When the extension is present and the hash still matches, the run kernels
+# below are taken from it and no JIT compilation happens at startup; otherwise
+# the @njit versions above are used (compiled on first call, cached in __pycache__).
+
+_RUN_ARGS = "f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], i8[:], f8[:], f8[:], f8[:], " \
+            "f8, f8, f8, f8, f8, f8, b1, f8, f8, f8, i8"
+_RUN_SIG = f"Tuple((f8[:, :], f8[:, :], f8[:], f8[:, :, :], f8))({_RUN_ARGS})"
+_BATCHED_SIG = (
+    "Tuple((f8[:, :, :], f8[:, :, :], f8[:, :], f8[:, :, :, :], f8[:]))("
+    "f8[:], f8[:, :], f8[:], f8[:, :], f8[:], f8[:, :], i8[:, :], f8[:, :], f8[:, :], f8[:, :], "
+    "f8, f8[:], f8[:], f8[:], f8[:], f8[:], b1[:], f8, f8, f8, i8, b1)"
+)
+_AOT_EXPORTS = {
+    "run_sequential": (run_sequential, _RUN_SIG),
+    "run_proportional": (run_proportional, _RUN_SIG),
+    "run_batched": (run_batched, _BATCHED_SIG),
+}
+
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_AOT_HASH_FILE = os.path.join(_HERE, "ecofair_kernels.source-hash")
+
+
+def _source_hash() -> str:
+    with open(os.path.abspath(__file__), "rb") as f:
+        return hashlib.blake2b(f.read()).hexdigest()
+
+
+def build_aot() -> None:
+    from numba.pycc import CC
+
+    cc = CC("ecofair_kernels")
+    cc.output_dir = _HERE
+    for name, (kernel, sig) in _AOT_EXPORTS.items():
+        cc.export(name, sig)(kernel.py_func)
+    cc.compile()
+    with open(_AOT_HASH_FILE, "w") as f:
+        f.write(_source_hash())
+
+
+def _aot_is_current() -> bool:
+    try:
+        with open(_AOT_HASH_FILE) as f:
+            return f.read().strip() == _source_hash()
+    except OSError:
+        return False
+
+
+if __name__ == "__main__":
+    build_aot()
+else:
+    try:
+        import ecofair_kernels as _aot
+    except ImportError:
+        _aot = None
+    if _aot is not None and not _aot_is_current():
+        warnings.warn(
+            "ecofair_kernels was built from a different _kernels.py; using the JIT kernels. "
+            "Rebuild with `python _kernels.py`.",
+            RuntimeWarning,
+        )
+        _aot = None
+    if _aot is not None:
+        run_sequential = _aot.run_sequential
+        run_proportional = _aot.run_proportional
+        run_batched = _aot.run_batched
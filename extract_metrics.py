@@ -1,25 +1,16 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple
-from collections import defaultdict
+from typing import Dict, Any, List, Tuple, Union
+import numpy as np
 
-from simulation import Supplier, ScenarioConfig, Logger
+from simulation import Supplier, ScenarioConfig, Logger, SUPPLIER_GROUPS, supplier_group_index
+from _gini_kernel import gini_kernel
 
 
-def gini(values: List[float]) -> float:
+def gini(values: Union[List[float], np.ndarray]) -> float:
     """Gini coefficient for nonnegative values."""
-    vals = [v for v in values if v >= 0]
-    n = len(vals)
-    if n == 0:
-        return 0.0
-    s = sum(vals)
-    if s == 0:
-        return 0.0
-    vals.sort()
-    cum = 0.0
-    for i, v in enumerate(vals, start=1):
-        cum += i * v
-    return (2.0 * cum) / (n * s) - (n + 1.0) / n
+    a = np.asarray(values, dtype=np.float64)
+    return gini_kernel(a[a >= 0])
 
 
 def extract_metrics(
@@ -37,54 +28,49 @@ def extract_metrics(
     # -----------------------------
     # 1) Aggregate allocations Q_s from logger
     # -----------------------------
-    Q_by_supplier = defaultdict(float)
-
-    for alloc_t in logger.allocations_per_t:
-        for (sid, _bid), q in alloc_t.items():
-            Q_by_supplier[sid] += float(q)
-
-    total_alloc = sum(Q_by_supplier.values())
+    Q_arr = None
+    if logger.n_steps:
+        Q_logged = logger.alloc_TN[:logger.n_steps].sum(axis=0)
+        # Supplier-aligned allocation totals
+        Q_arr = Q_logged[[logger.sid2ix[s.id] for s in suppliers]]
 
     # If logging is missing, fall back to Supplier.Q (still works if update_fairness ran)
-    if total_alloc == 0.0:
-        Q_by_supplier = {s.id: float(s.Q) for s in suppliers}
-        total_alloc = sum(Q_by_supplier.values())
+    if Q_arr is None or Q_arr.sum() == 0.0:
+        Q_arr = np.array([s.Q for s in suppliers], dtype=np.float64)
+
+    # NumPy's pairwise summation: faster and more accurate than a running float sum
+    total_alloc = float(Q_arr.sum())
 
     n_suppliers = len(suppliers)
     eps = 1e-12  # avoids counting tiny floating allocations
-    n_active = sum(1 for sid in [s.id for s in suppliers] if float(Q_by_supplier.get(sid, 0.0)) > eps)
+    n_active = int((Q_arr > eps).sum())
     participation_rate = (n_active / n_suppliers) if n_suppliers else 0.0
 
     # Historical shares H_s
-    if total_alloc > 0:
-        H_by_supplier = {sid: q / total_alloc for sid, q in Q_by_supplier.items()}
-    else:
-        H_by_supplier = {s.id: 0.0 for s in suppliers}
+    H_arr = Q_arr / total_alloc if total_alloc > 0 else np.zeros_like(Q_arr)
 
-    share_vals = [H_by_supplier.get(s.id, 0.0) for s in suppliers]
-    share_gini = gini(share_vals)
-    share_max = max(share_vals) if share_vals else 0.0
+    share_gini = gini(H_arr)
+    share_max = float(H_arr.max()) if H_arr.size else 0.0
 
     # -----------------------------
     # 2) Group shares (A/B/C) from supplier IDs
     # -----------------------------
-    group = {"A": 0.0, "B": 0.0, "C": 0.0}
-    for sid, h in H_by_supplier.items():
-        if sid.startswith("A"):
-            group["A"] += h
-        elif sid.startswith("B"):
-            group["B"] += h
-        elif sid.startswith("C"):
-            group["C"] += h
+    group_H = np.bincount(
+        supplier_group_index(suppliers),
+        weights=H_arr,
+        minlength=len(SUPPLIER_GROUPS) + 1,
+    )
+    group = {g: float(group_H[i]) for i, g in enumerate(SUPPLIER_GROUPS)}
 
     # -----------------------------
     # 3) Emissions aggregates
     # -----------------------------
-    co2_prod_sum = sum(e.get("CO2_prod", 0.0) for e in logger.emissions_per_t)
-    co2_trans_sum = sum(e.get("CO2_trans", 0.0) for e in logger.emissions_per_t)
-    co2_total_sum = sum(e.get("CO2_total", 0.0) for e in logger.emissions_per_t)
+    n_steps = logger.n_steps
+    co2_prod_sum = float(logger.co2_prod[:n_steps].sum())
+    co2_trans_sum = float(logger.co2_trans[:n_steps].sum())
+    co2_total_sum = float(logger.co2_total[:n_steps].sum())
 
-    T = len(logger.emissions_per_t) if logger.emissions_per_t else max(1, scenario.T)
+    T = n_steps if n_steps else max(1, scenario.T)
     co2_total_mean = co2_total_sum / T
 
     # -----------------------------
@@ -96,12 +82,12 @@ def extract_metrics(
     # For now, assume you stored it in results.json elsewhere, or compute here if you want.
 
     # Placeholder: if you have cost logged per timestep in emissions dict, read it; else 0.
-    #cost_total_sum = sum(logger.cost_total_per_t) if hasattr(logger, "cost_total_per_t") else 0.0
+    #cost_total_sum = float(logger.cost_total[:n_steps].sum())
     #cost_total_mean = cost_total_sum / T if T > 0 else 0.0
 
-    if hasattr(logger, "cost_total_per_t") and logger.cost_total_per_t:
-        cost_total_sum = sum(logger.cost_total_per_t)
-        cost_total_mean = cost_total_sum / len(logger.cost_total_per_t)
+    if n_steps:
+        cost_total_sum = float(logger.cost_total[:n_steps].sum())
+        cost_total_mean = cost_total_sum / n_steps
     else:
         cost_total_sum = 0.0
         cost_total_mean = 0.0
@@ -148,8 +134,8 @@ def extract_metrics(
             },
             # optional: keep supplier-level too, for later plots
             "by_id": {
-                sid: {"Q": float(Q_by_supplier[sid]), "H": float(H_by_supplier.get(sid, 0.0))}
-                for sid in Q_by_supplier.keys()
+                s.id: {"Q": q, "H": h}
+                for s, q, h in zip(suppliers, Q_arr.tolist(), H_arr.tolist())
             },
         },
     }
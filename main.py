@@ -18,8 +18,8 @@ from metrics import extract_metrics
 def run_single(scenario_key: str = "S1", seed: int = 42):
     scenario = SCENARIOS[scenario_key]
 
-    random.seed(seed)
-    suppliers = create_suppliers_ABC()
+    rng = random.Random(seed)         # makes distances reproducible
+    suppliers = create_suppliers_ABC(rng=rng)
     buyers = [create_example_buyer()]
 
     env = EnvironmentalDataModule(
@@ -35,7 +35,7 @@ def run_single(scenario_key: str = "S1", seed: int = 42):
     fairness = FairnessModule(delta=scenario.delta, eps=1e-9, disp_cap=5.0)
     policy = PolicyScoringModule(scenario)
     marketplace = MarketplaceModule(env, fairness, policy)
-    logger = Logger()
+    logger = Logger(T=scenario.T, supplier_ids=[s.id for s in suppliers])
 
     sim = Simulation(
         suppliers=suppliers,
@@ -1,10 +1,6 @@
-import json
 from typing import Dict, Any, List
 
-
-def load_results(path: str = "results.json") -> Dict[str, Any]:
-    with open(path, "r") as f:
-        return json.load(f)
+from results_io import load_results
 
 
 def scenario_order(results: Dict[str, Any]) -> List[str]:
@@ -25,13 +21,29 @@ def scenario_label(key: str) -> str:
     return mapping.get(key, key)
 
 
-def fmt(x: float, nd: int = 3) -> str:
-    return f"{x:.{nd}f}"
+# Precompiled formatters for the fixed precisions used in the tables
+_fmt2 = "{:.2f}".format
+_fmt3 = "{:.3f}".format
 
 
-def build_table_ii(results: Dict[str, Any]) -> str:
-    keys = scenario_order(results)
+# Row layout shared by both tables; the efficiency columns are always 2 decimals,
+# the fairness columns are passed preformatted (precision / "--" differ per table)
+ROW_FMT = r"{label} & {co2s:.2f} & {co2m:.2f} & {costm:.2f} & {part} & {gini} & {mx} \\"
+
+
+def format_row(label: str, summary: Dict[str, Any], part: str, gini: str, mx: str) -> str:
+    return ROW_FMT.format(
+        label=label,
+        co2s=float(summary["co2_total_sum"]),
+        co2m=float(summary["co2_total_mean"]),
+        costm=float(summary["cost_total_mean"]),
+        part=part,
+        gini=gini,
+        mx=mx,
+    )
+
 
+def build_table_ii(results: Dict[str, Any], keys: List[str], labels: List[str]) -> str:
     lines = []
     lines.append(r"\begin{table}[t]")
     lines.append(r"\caption{Summary outcomes across policy scenarios.}")
@@ -43,9 +55,10 @@ def build_table_ii(results: Dict[str, Any]) -> str:
     lines.append(r"Scenario & Total CO$_2$ & Mean CO$_2$/t & Mean Cost/t & Part. rate & Gini$(H)$ & Max$(H)$ \\")
     lines.append(r"\hline")
 
-    for k in keys:
-        summary = results[k]["summary"]
-        params = results[k].get("params", {})
+    for k, label in zip(keys, labels):
+        res = results[k]
+        summary = res["summary"]
+        params = res.get("params", {})
 
         use_fairness = bool(params.get("use_fairness", False))
 
@@ -54,22 +67,13 @@ def build_table_ii(results: Dict[str, Any]) -> str:
 
         # Fairness metrics: only meaningful when fairness is enabled
         if use_fairness:
-            gini_str = fmt(float(summary.get("share_gini", 0.0)), 3)
-            max_str = fmt(float(summary.get("share_max", 0.0)), 3)
+            gini_str = _fmt3(float(summary.get("share_gini", 0.0)))
+            max_str = _fmt3(float(summary.get("share_max", 0.0)))
         else:
             gini_str = r"--"
             max_str = r"--"
 
-        row = " & ".join([
-            scenario_label(k),
-            fmt(float(summary["co2_total_sum"]), 2),
-            fmt(float(summary["co2_total_mean"]), 2),
-            fmt(float(summary["cost_total_mean"]), 2),
-            fmt(float(part), 2),
-            gini_str,
-            max_str,
-        ]) + r" \\"
-        lines.append(row)
+        lines.append(format_row(label, summary, _fmt2(float(part)), gini_str, max_str))
 
     lines.append(r"\hline")
     lines.append(r"\end{tabular}%")
@@ -78,9 +82,7 @@ def build_table_ii(results: Dict[str, Any]) -> str:
     lines.append("")
     return "\n".join(lines)
 
-def build_table_i(results: Dict[str, Any]) -> str:
-    keys = scenario_order(results)
-
+def build_table_i(results: Dict[str, Any], keys: List[str], labels: List[str]) -> str:
     lines = []
     lines.append(r"\begin{table}[t]")
     lines.append(r"\caption{Summary outcomes across policy scenarios.}")
@@ -95,18 +97,15 @@ def build_table_i(results: Dict[str, Any]) -> str:
     lines.append(r"\textbf{Scenario} & Total CO$_2$ & Mean CO$_2$/t & Mean Cost/t & Partic. & Gini$(H)$ & Max$(H)$ \\")
     lines.append(r"\hline")
 
-    for k in keys:
+    for k, label in zip(keys, labels):
         s = results[k]["summary"]
-        row = " & ".join([
-            scenario_label(k),
-            fmt(float(s["co2_total_sum"]), 2),
-            fmt(float(s["co2_total_mean"]), 2),
-            fmt(float(s["cost_total_mean"]), 2),
-            fmt(float(s["participation_rate"]), 3),
-            fmt(float(s["share_gini"]), 3),
-            fmt(float(s["share_max"]), 3),
-        ]) + r" \\"
-        lines.append(row)
+        lines.append(format_row(
+            label,
+            s,
+            _fmt3(float(s["participation_rate"])),
+            _fmt3(float(s["share_gini"])),
+            _fmt3(float(s["share_max"])),
+        ))
 
     lines.append(r"\hline")
     lines.append(r"\end{tabular}%")
@@ -118,8 +117,13 @@ def build_table_i(results: Dict[str, Any]) -> str:
 
 def main():
     results = load_results("results.json")
-    table_tex = build_table_ii(results)
-    table_tex_i = build_table_i(results)
+
+    # Scenario order and labels are shared by both tables
+    keys = scenario_order(results)
+    labels = [scenario_label(k) for k in keys]
+
+    table_tex = build_table_ii(results, keys, labels)
+    table_tex_i = build_table_i(results, keys, labels)
 
     out_path = "table_ii.tex"
     with open(out_path, "w") as f:
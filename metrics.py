@@ -1,25 +1,18 @@
 from __future__ import annotations
-from typing import Dict, Any, List
-import statistics
+from typing import Dict, Any, List, Union
+
+import numpy as np
 
 from simulation import Supplier, ScenarioConfig, Logger
+from _gini_kernel import gini_kernel
 
 
 def infer_group(supplier_id: str) -> str:
     return supplier_id[0].upper() if supplier_id else "?"
 
 
-def gini(values: List[float]) -> float:
-    vals = [max(0.0, float(v)) for v in values]
-    s = sum(vals)
-    n = len(vals)
-    if n == 0 or s == 0:
-        return 0.0
-    vals.sort()
-    cum = 0.0
-    for i, v in enumerate(vals, start=1):
-        cum += i * v
-    return (2.0 * cum) / (n * s) - (n + 1.0) / n
+def gini(values: Union[List[float], np.ndarray]) -> float:
+    return gini_kernel(np.maximum(np.asarray(values, dtype=np.float64), 0.0))
 
 
 def extract_metrics(
@@ -32,35 +25,39 @@ def extract_metrics(
     T = scenario.T
 
     # --- timeseries from logger ---
-    co2_prod = [e["CO2_prod"] for e in logger.emissions_per_t[:T]]
-    co2_trans = [e["CO2_trans"] for e in logger.emissions_per_t[:T]]
-    co2_total = [e["CO2_total"] for e in logger.emissions_per_t[:T]]
-    cost_total = list(logger.cost_total_per_t[:T])
-    allocated_total = list(logger.allocated_total_per_t[:T])
+    n = min(T, logger.n_steps)
+    co2_prod = logger.co2_prod[:n]
+    co2_trans = logger.co2_trans[:n]
+    co2_total = logger.co2_total[:n]
+    cost_total = logger.cost_total[:n]
+    allocated_total = logger.allocated_total[:n]
 
     # --- summary ---
-    co2_prod_sum = sum(co2_prod)
-    co2_trans_sum = sum(co2_trans)
-    co2_total_sum = sum(co2_total)
-    cost_total_sum = sum(cost_total)
+    co2_prod_sum = float(co2_prod.sum())
+    co2_trans_sum = float(co2_trans.sum())
+    co2_total_sum = float(co2_total.sum())
+    cost_total_sum = float(cost_total.sum())
 
-    co2_total_mean = co2_total_sum / len(co2_total) if co2_total else 0.0
-    cost_total_mean = cost_total_sum / len(cost_total) if cost_total else 0.0
+    co2_total_mean = co2_total_sum / n if n else 0.0
+    cost_total_mean = cost_total_sum / n if n else 0.0
 
-    total_allocated = sum(allocated_total)
+    total_allocated = float(allocated_total.sum())
 
     # --- supplier stats ---
     total_Q = sum(s.Q for s in suppliers)
     total_Cap = sum(s.cap_nominal for s in suppliers)
 
+    # Single pass over suppliers: per-id records plus supplier-aligned Q/H arrays
     by_id: Dict[str, Dict[str, float]] = {}
-    shares: List[float] = []
+    qs = np.empty(len(suppliers))
+    shares = np.empty(len(suppliers))
 
-    for s in suppliers:
+    for i, s in enumerate(suppliers):
         Q = float(s.Q)
         H = Q / total_Q if total_Q > 0 else 0.0
         E = float(s.cap_nominal) / total_Cap if total_Cap > 0 else 0.0
-        shares.append(H)
+        qs[i] = Q
+        shares[i] = H
         by_id[s.id] = {
             "Q": Q,
             "H": H,
@@ -70,16 +67,21 @@ def extract_metrics(
             "F_uni": float(s.F_unified),
         }
 
-    by_group: Dict[str, Dict[str, float]] = {}
-    for sid, rec in by_id.items():
-        g = infer_group(sid)
-        by_group.setdefault(g, {"Q": 0.0, "H": 0.0})
-        by_group[g]["Q"] += rec["Q"]
-        by_group[g]["H"] += rec["H"]
+    # Groups by first id letter, in order of first appearance
+    labels = [infer_group(s.id) for s in suppliers]
+    group_names = list(dict.fromkeys(labels))
+    lookup = {g: i for i, g in enumerate(group_names)}
+    group_ix = np.array([lookup[g] for g in labels], dtype=np.intp)
+    group_Q = np.bincount(group_ix, weights=qs, minlength=len(group_names))
+    group_H = np.bincount(group_ix, weights=shares, minlength=len(group_names))
+    by_group: Dict[str, Dict[str, float]] = {
+        g: {"Q": float(group_Q[i]), "H": float(group_H[i])}
+        for i, g in enumerate(group_names)
+    }
 
     share_gini = gini(shares)
-    share_max = max(shares) if shares else 0.0
-    share_std = statistics.pstdev(shares) if len(shares) > 1 else 0.0
+    share_max = float(shares.max()) if shares.size else 0.0
+    share_std = float(shares.std()) if shares.size > 1 else 0.0
 
     metrics: Dict[str, Any] = {
         "meta": {
@@ -100,11 +102,11 @@ def extract_metrics(
             "seed": seed,
         },
         "timeseries": {
-            "co2_prod": co2_prod,
-            "co2_trans": co2_trans,
-            "co2_total": co2_total,
-            "cost_total": cost_total,
-            "allocated_total": allocated_total,
+            "co2_prod": co2_prod.tolist(),
+            "co2_trans": co2_trans.tolist(),
+            "co2_total": co2_total.tolist(),
+            "cost_total": cost_total.tolist(),
+            "allocated_total": allocated_total.tolist(),
         },
         "summary": {
             "co2_prod_sum": co2_prod_sum,
@@ -1,18 +1,16 @@
-import json
 import os
 from typing import Dict, Any, List, Tuple
 
+import matplotlib
+matplotlib.use("Agg")  # file output only: skip the interactive backend probe
 import matplotlib.pyplot as plt
 
+from results_io import load_results
+
 
 # -------------------------
 # Helpers
 # -------------------------
-def load_results(path: str = "results.json") -> Dict[str, Any]:
-    with open(path, "r") as f:
-        return json.load(f)
-
-
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
@@ -47,24 +45,30 @@ def get_suppliers_group(results: Dict[str, Any], key: str) -> Dict[str, Any]:
     return results[key]["suppliers"]["by_group"]
 
 
+def reset_axes(ax, figsize: Tuple[float, float]):
+    """Clear the shared axes and resize its figure for the next plot."""
+    fig = ax.figure
+    ax.cla()
+    fig.set_size_inches(*figsize)
+    return fig
+
+
 def save_fig(fig, outdir: str, name: str) -> None:
     png = os.path.join(outdir, f"{name}.png")
     pdf = os.path.join(outdir, f"{name}.pdf")
-    fig.savefig(png, dpi=300, bbox_inches="tight")
-    fig.savefig(pdf, bbox_inches="tight")
-    plt.close(fig)
+    # Same bounds as bbox_inches="tight", but computed once for both formats
+    bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(0.1)
+    fig.savefig(png, dpi=300, bbox_inches=bbox)
+    fig.savefig(pdf, bbox_inches=bbox)
 
 
 # -------------------------
 # Figures
 # -------------------------
-def fig_total_co2_bar(results: Dict[str, Any], outdir: str) -> None:
-    keys = scenario_order(results)
-    labels = [scenario_label(k, results) for k in keys]
+def fig_total_co2_bar(results: Dict[str, Any], outdir: str, keys: List[str], labels: List[str], ax) -> None:
     values = [get_summary(results, k)["co2_total_sum"] for k in keys]
 
-    fig = plt.figure(figsize=(7.0, 3.2))
-    ax = fig.add_subplot(111)
+    fig = reset_axes(ax, (7.0, 3.2))
     ax.bar(labels, values)
     ax.set_ylabel("Total CO₂ (sum over T)")
     ax.set_xlabel("Scenario")
@@ -74,14 +78,12 @@ def fig_total_co2_bar(results: Dict[str, Any], outdir: str) -> None:
     save_fig(fig, outdir, "fig1_total_co2")
 
 
-def fig_co2_breakdown_stacked(results: Dict[str, Any], outdir: str) -> None:
-    keys = scenario_order(results)
-    labels = [scenario_label(k, results) for k in keys]
-    prod = [get_summary(results, k)["co2_prod_sum"] for k in keys]
-    trans = [get_summary(results, k)["co2_trans_sum"] for k in keys]
+def fig_co2_breakdown_stacked(results: Dict[str, Any], outdir: str, keys: List[str], labels: List[str], ax) -> None:
+    summaries = [get_summary(results, k) for k in keys]
+    prod = [s["co2_prod_sum"] for s in summaries]
+    trans = [s["co2_trans_sum"] for s in summaries]
 
-    fig = plt.figure(figsize=(7.0, 3.2))
-    ax = fig.add_subplot(111)
+    fig = reset_axes(ax, (7.0, 3.2))
     ax.bar(labels, prod, label="Production CO₂")
     ax.bar(labels, trans, bottom=prod, label="Transport CO₂")
     ax.set_ylabel("CO₂ (sum over T)")
@@ -92,13 +94,10 @@ def fig_co2_breakdown_stacked(results: Dict[str, Any], outdir: str) -> None:
     save_fig(fig, outdir, "fig2_co2_breakdown")
 
 
-def fig_cost_bar(results: Dict[str, Any], outdir: str) -> None:
-    keys = scenario_order(results)
-    labels = [scenario_label(k, results) for k in keys]
+def fig_cost_bar(results: Dict[str, Any], outdir: str, keys: List[str], labels: List[str], ax) -> None:
     values = [get_summary(results, k)["cost_total_mean"] for k in keys]
 
-    fig = plt.figure(figsize=(7.0, 3.2))
-    ax = fig.add_subplot(111)
+    fig = reset_axes(ax, (7.0, 3.2))
     ax.bar(labels, values)
     ax.set_ylabel("Mean cost per timestep")
     ax.set_xlabel("Scenario")
@@ -107,24 +106,17 @@ def fig_cost_bar(results: Dict[str, Any], outdir: str) -> None:
     save_fig(fig, outdir, "fig3_cost_mean")
 
 
-def fig_group_shares(results: Dict[str, Any], outdir: str) -> None:
-    keys = scenario_order(results)
-    labels = [scenario_label(k, results) for k in keys]
-
+def fig_group_shares(results: Dict[str, Any], outdir: str, keys: List[str], labels: List[str], ax) -> None:
     # Extract H shares by group for each scenario
     groups = ["A", "B", "C"]
-    group_H = {g: [] for g in groups}
-    for k in keys:
-        by_group = get_suppliers_group(results, k)
-        for g in groups:
-            group_H[g].append(float(by_group.get(g, {}).get("H", 0.0)))
+    by_group = [get_suppliers_group(results, k) for k in keys]
+    group_H = {g: [float(bg.get(g, {}).get("H", 0.0)) for bg in by_group] for g in groups}
 
     # grouped bars
     x = list(range(len(keys)))
     width = 0.25
 
-    fig = plt.figure(figsize=(7.2, 3.2))
-    ax = fig.add_subplot(111)
+    fig = reset_axes(ax, (7.2, 3.2))
 
     ax.bar([i - width for i in x], group_H["A"], width=width, label="Group A")
     ax.bar(x, group_H["B"], width=width, label="Group B")
@@ -140,22 +132,21 @@ def fig_group_shares(results: Dict[str, Any], outdir: str) -> None:
     save_fig(fig, outdir, "fig4_group_shares")
 
 
-def fig_fairness_compare_s4(results: Dict[str, Any], outdir: str) -> None:
+def fig_fairness_compare_s4(results: Dict[str, Any], outdir: str, ax) -> None:
     # Only plot if these exist
     keys = [k for k in ["S4A", "S4B", "S4C"] if k in results]
     if not keys:
         return
 
     labels = ["Balanced (δ=0.5)", "Disparity (δ=0)", "Rotation (δ=1)"]
-    gini_vals = [get_summary(results, k)["share_gini"] for k in keys]
-    maxshare_vals = [get_summary(results, k)["share_max"] for k in keys]
+    summaries = [get_summary(results, k) for k in keys]
+    gini_vals = [s["share_gini"] for s in summaries]
+    maxshare_vals = [s["share_max"] for s in summaries]
 
     x = list(range(len(keys)))
     width = 0.35
 
-    fig = plt.figure(figsize=(6.2, 3.2))
-
-    ax = fig.add_subplot(111)
+    fig = reset_axes(ax, (6.2, 3.2))
     ax.bar([i - width / 2 for i in x], gini_vals, width=width, label="Gini(H)")
     ax.bar([i + width / 2 for i in x], maxshare_vals, width=width, label="Max share(H)")
     # Optional: give a little headroom
@@ -182,14 +173,11 @@ def fig_fairness_compare_s4(results: Dict[str, Any], outdir: str) -> None:
 
     save_fig(fig, outdir, "fig5_fairness_s4_compare")
 
-def fig_participation_rate(results: Dict[str, Any], outdir: str) -> None:
-    keys = scenario_order(results)
-    labels = [scenario_label(k, results) for k in keys]
+def fig_participation_rate(results: Dict[str, Any], outdir: str, keys: List[str], labels: List[str], ax) -> None:
     #values = [float(get_summary(results, k).get("participation_rate", 0.0)) for k in keys]
     values = [get_summary(results, k)["participation_rate"] for k in keys]
 
-    fig = plt.figure(figsize=(7.0, 3.2))
-    ax = fig.add_subplot(111)
+    fig = reset_axes(ax, (7.0, 3.2))
     ax.bar(labels, values)
     ax.set_ylim(0, 1.0)
     ax.set_ylabel("Participation rate")
@@ -206,12 +194,21 @@ def main():
     outdir = "figures"
     ensure_dir(outdir)
 
-    fig_total_co2_bar(results, outdir)
-    fig_co2_breakdown_stacked(results, outdir)
-    fig_cost_bar(results, outdir)
-    fig_group_shares(results, outdir)
-    #fig_fairness_compare_s4(results, outdir)
-    fig_participation_rate(results, outdir)
+    # Scenario order and labels are shared by every figure
+    keys = scenario_order(results)
+    labels = [scenario_label(k, results) for k in keys]
+
+    # One figure is reused (cleared and resized) for every plot
+    fig, ax = plt.subplots()
+
+    fig_total_co2_bar(results, outdir, keys, labels, ax)
+    fig_co2_breakdown_stacked(results, outdir, keys, labels, ax)
+    fig_cost_bar(results, outdir, keys, labels, ax)
+    fig_group_shares(results, outdir, keys, labels, ax)
+    #fig_fairness_compare_s4(results, outdir, ax)
+    fig_participation_rate(results, outdir, keys, labels, ax)
+
+    plt.close(fig)
 
     print(f"Saved figures to: {outdir}/ (PNG + PDF)")
 
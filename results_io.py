@@ -0,0 +1,53 @@
+import os
+from typing import Dict, Any, Iterable, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional: fall back to the stdlib encoder
+    orjson = None
+    import json
+
+
+def dump_results(results: Dict[str, Any], path: str = "results.json") -> None:
+    """Write the results dict as indented JSON (NumPy arrays/scalars allowed with orjson)."""
+    with open(path, "wb") as f:
+        f.write(_dumps(results))
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2).encode()
+
+
+def stream_results(items: Iterable[Tuple[str, Dict[str, Any]]], path: str = "results.json") -> None:
+    """
+    Write (scenario_key, metrics) pairs as one JSON object, encoding each entry
+    as it arrives so only one scenario's metrics are held at a time.
+    The file matches dump_results() on the equivalent dict. Output goes to a
+    temporary file that replaces `path` only once every item was written, so a
+    failing run leaves the previous file intact.
+    """
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(b"{")
+            sep = b"\n"
+            for key, metrics in items:
+                value = _dumps(metrics).replace(b"\n", b"\n  ")
+                f.write(sep + b"  " + _dumps(key) + b": " + value)
+                sep = b",\n"
+            f.write(b"\n}" if sep != b"\n" else b"}")
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+
+
+def load_results(path: str = "results.json") -> Dict[str, Any]:
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r") as f:
+        return json.load(f)
@@ -1,6 +1,11 @@
-import json
+import dataclasses
+import hashlib
+import os
+import pickle
 import random
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from simulation import (
     create_suppliers_ABC,
@@ -11,19 +16,82 @@ from simulation import (
     MarketplaceModule,
     Logger,
     Simulation,
+    batch_group,
+    run_batched,
 )
 from scenarios import SCENARIOS
 from extract_metrics import extract_metrics
+from results_io import stream_results
 
 
-def run_one(scenario_key: str, seed: int = 42) -> Dict[str, Any]:
+CACHE_DIR = ".cache"
+
+# Fairness module constants shared by every run
+FAIRNESS_EPS = 1e-9
+DISP_CAP = 5.0
+
+# Modules whose code determines the cached metrics
+_CACHED_SOURCES = ("simulation.py", "_kernels.py", "extract_metrics.py", "_gini_kernel.py")
+_source_digest: Optional[str] = None
+
+
+def _code_digest() -> str:
+    global _source_digest
+    if _source_digest is None:
+        h = hashlib.blake2b()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in _CACHED_SOURCES:
+            with open(os.path.join(here, name), "rb") as f:
+                h.update(f.read())
+        _source_digest = h.hexdigest()
+    return _source_digest
+
+
+def _cache_path(scenario_key: str, seed: int) -> str:
+    # Everything a run depends on is part of the key: scenario fields, the
+    # environment, the generated suppliers/buyer, fairness constants and the
+    # simulation code itself, so any change invalidates the entry
     scenario = SCENARIOS[scenario_key]
+    key = repr((
+        scenario_key,
+        seed,
+        dataclasses.asdict(scenario),
+        vars(make_environment()),
+        [dataclasses.asdict(s) for s in create_suppliers_ABC(rng=random.Random(seed))],
+        dataclasses.asdict(create_example_buyer()),
+        (FAIRNESS_EPS, DISP_CAP),
+        _code_digest(),
+    ))
+    digest = hashlib.blake2b(key.encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"run_{digest}.pkl")
 
-    random.seed(seed)                 # makes distances reproducible
-    suppliers = create_suppliers_ABC()
-    buyers = [create_example_buyer()]
 
-    env = EnvironmentalDataModule(
+def _store(scenario_key: str, seed: int, metrics: Dict[str, Any]) -> None:
+    path = _cache_path(scenario_key, seed)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(metrics, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def run_one(scenario_key: str, seed: int = 42, use_cache: bool = True) -> Dict[str, Any]:
+    """Return metrics for one scenario, reusing a pickled result from CACHE_DIR if present."""
+    if not use_cache:
+        return simulate_one(scenario_key, seed=seed)
+
+    path = _cache_path(scenario_key, seed)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    metrics = simulate_one(scenario_key, seed=seed)
+    _store(scenario_key, seed, metrics)
+    return metrics
+
+
+def make_environment() -> EnvironmentalDataModule:
+    return EnvironmentalDataModule(
         static_co2=5.0,
         individualized_co2={
             "A1": 4.0, "A2": 4.0, "A3": 4.0,
@@ -33,10 +101,20 @@ def run_one(scenario_key: str, seed: int = 42) -> Dict[str, Any]:
         co2_per_km=0.01,
     )
 
-    fairness = FairnessModule(delta=scenario.delta, eps=1e-9, disp_cap=5.0)
+
+def simulate_one(scenario_key: str, seed: int = 42) -> Dict[str, Any]:
+    scenario = SCENARIOS[scenario_key]
+
+    rng = random.Random(seed)         # makes distances reproducible
+    suppliers = create_suppliers_ABC(rng=rng)
+    buyers = [create_example_buyer()]
+
+    env = make_environment()
+
+    fairness = FairnessModule(delta=scenario.delta, eps=FAIRNESS_EPS, disp_cap=DISP_CAP)
     policy = PolicyScoringModule(scenario)
     marketplace = MarketplaceModule(env, fairness, policy)
-    logger = Logger()
+    logger = Logger(T=scenario.T, supplier_ids=[s.id for s in suppliers])
 
     sim = Simulation(
         suppliers=suppliers,
@@ -59,15 +137,77 @@ def run_one(scenario_key: str, seed: int = 42) -> Dict[str, Any]:
     )
 
 
-def run_all(seed: int = 42) -> Dict[str, Dict[str, Any]]:
-    results = {}
-    for key in SCENARIOS.keys():
-        results[key] = run_one(key, seed=seed)
-    return results
+def simulate_batched(scenario_keys: List[str], seed: int = 42) -> Dict[str, Dict[str, Any]]:
+    """Metrics for several scenarios, simulated together by simulation.run_batched."""
+    rng = random.Random(seed)         # same distances as simulate_one for this seed
+    suppliers = create_suppliers_ABC(rng=rng)
+    scenarios = [SCENARIOS[k] for k in scenario_keys]
+
+    runs = run_batched(scenarios, suppliers, create_example_buyer(), make_environment(),
+                       eps=FAIRNESS_EPS, disp_cap=DISP_CAP)
+    return {
+        key: extract_metrics(
+            scenario_key=key,
+            scenario=scenario,
+            suppliers=run_suppliers,
+            logger=logger,
+            seed=seed,
+        )
+        for key, scenario, (run_suppliers, logger) in zip(scenario_keys, scenarios, runs)
+    }
+
+
+def iter_results(
+    seed: int = 42,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    batched: bool = True,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (scenario_key, metrics) in SCENARIOS order.
+    batched=True simulates uncached scenarios one run_batched group (allocation
+    mode and T) per kernel call, when the first scenario of the group is due;
+    only that group's not-yet-yielded metrics are held, and cached entries are
+    loaded as they are yielded.
+    batched=False runs them one per worker process (workers=None uses all cores).
+    """
+    keys = list(SCENARIOS.keys())
+    if not batched:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            yield from zip(keys, ex.map(run_one, keys, repeat(seed), repeat(use_cache)))
+        return
+
+    is_cached = {k: use_cache and os.path.exists(_cache_path(k, seed)) for k in keys}
+    pending: Dict[str, Dict[str, Any]] = {}    # simulated, not yet yielded
+
+    for key in keys:
+        if is_cached[key]:
+            with open(_cache_path(key, seed), "rb") as f:
+                yield key, pickle.load(f)
+            continue
+
+        if key not in pending:
+            group = batch_group(SCENARIOS[key])
+            members = [k for k in keys[keys.index(key):]
+                       if not is_cached[k] and batch_group(SCENARIOS[k]) == group]
+            pending.update(simulate_batched(members, seed=seed))
+            if use_cache:
+                for k in members:
+                    _store(k, seed, pending[k])
+
+        yield key, pending.pop(key)
+
+
+def run_all(
+    seed: int = 42,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    batched: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    return dict(iter_results(seed=seed, workers=workers, use_cache=use_cache, batched=batched))
 
 
 if __name__ == "__main__":
-    results = run_all(seed=42)
-    with open("results.json", "w") as f:
-        json.dump(results, f, indent=2)
+    # Each scenario is written out as soon as it is done instead of building the full dict first
+    stream_results(iter_results(seed=42), "results.json")
     print("Saved results.json")
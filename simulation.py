@@ -1,14 +1,19 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+import copy
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple, Union
 import random
 
+import numpy as np
+
+import _kernels
+
 
 # =========================
 #  AGENT DATA STRUCTURES
 #  (Section III-B, IV-B)
 # =========================
 
-@dataclass
+@dataclass(slots=True)
 class Supplier:
     id: str
     c: float                      # base cost c_s
@@ -31,7 +36,7 @@ class Supplier:
         self.cap_available = self.cap_nominal
 
 
-@dataclass
+@dataclass(slots=True)
 class Buyer:
     id: str
     demand_nominal: float         # D_b per timestep
@@ -46,6 +51,65 @@ class Buyer:
         self.demand_remaining = self.demand_nominal
 
 
+# =========================
+#  SUPPLIER STATE ARRAYS
+#  (structure-of-arrays view of the agents above)
+# =========================
+
+@dataclass
+class SupplierArrays:
+    """
+    Supplier state as parallel NumPy arrays, aligned by supplier index.
+    Built once per Simulation; all per-step math runs on these arrays and
+    the Supplier objects are synced back at the end of Simulation.run().
+    """
+    ids: List[str]
+    c: np.ndarray                 # base cost c_s
+    co2: np.ndarray               # production CO2 intensity CO2_s
+    cap_nominal: np.ndarray       # nominal capacity Cap_s
+    dist: np.ndarray              # d_{sb} to the representative buyer
+    Q: np.ndarray                 # cumulative allocated quantity Q_s
+    rot_wait: np.ndarray          # rounds since last selected r_s (int64)
+    F_rot: np.ndarray
+    F_disp: np.ndarray
+    F_unified: np.ndarray
+    cap_available: np.ndarray
+
+    @classmethod
+    def from_suppliers(cls, suppliers: List[Supplier], buyer: Buyer) -> "SupplierArrays":
+        def col(attr: str, dtype=np.float64) -> np.ndarray:
+            return np.array([getattr(s, attr) for s in suppliers], dtype=dtype)
+
+        return cls(
+            ids=[s.id for s in suppliers],
+            c=col("c"),
+            co2=col("co2"),
+            cap_nominal=col("cap_nominal"),
+            dist=np.array([s.distances[buyer.id] for s in suppliers], dtype=np.float64),
+            Q=col("Q"),
+            rot_wait=col("rot_wait", np.int64),
+            F_rot=col("F_rot"),
+            F_disp=col("F_disp"),
+            F_unified=col("F_unified"),
+            cap_available=col("cap_available"),
+        )
+
+    def fairness_snapshot(self) -> np.ndarray:
+        """(N, 4) rows of Q, F_rot, F_disp, F_unified, the layout Logger.record expects."""
+        return np.column_stack((self.Q, self.F_rot, self.F_disp, self.F_unified))
+
+    def write_back(self, suppliers: List[Supplier]) -> None:
+        """Mirror the array state onto the Supplier objects (same order)."""
+        for i, s in enumerate(suppliers):
+            s.co2 = float(self.co2[i])
+            s.Q = float(self.Q[i])
+            s.rot_wait = int(self.rot_wait[i])
+            s.F_rot = float(self.F_rot[i])
+            s.F_disp = float(self.F_disp[i])
+            s.F_unified = float(self.F_unified[i])
+            s.cap_available = float(self.cap_available[i])
+
+
 # =========================
 #  SCENARIO CONFIGURATION
 #  (Section III-F, IV-D)
@@ -94,6 +158,12 @@ class EnvironmentalDataModule:
         else:
             return self.static_co2
 
+    def co2_vector(self, suppliers: List[Supplier], scenario: ScenarioConfig) -> np.ndarray:
+        """CO2_s for every supplier (same order), fixed for the whole run."""
+        if scenario.use_individualized_lca:
+            return np.array([self.individualized_co2.get(s.id, self.static_co2) for s in suppliers])
+        return np.full(len(suppliers), self.static_co2)
+
     def get_distance(self, supplier: Supplier, buyer: Buyer) -> float:
         """Return distance d_{sb} (assumed already set in supplier.distances)."""
         return supplier.distances[buyer.id]
@@ -117,51 +187,16 @@ class FairnessModule:
 
     def update_fairness(
             self,
-            suppliers: List[Supplier],
-            allocations: Dict[Tuple[str, str], float]
+            arrays: SupplierArrays,
+            alloc: np.ndarray,
     ) -> None:
-        # 1) Update cumulative allocations Q_s
-        allocated_by_supplier = {s.id: 0.0 for s in suppliers}
-        for (sid, _), q in allocations.items():
-            allocated_by_supplier[sid] += q
-
-        for s in suppliers:
-            s.Q += allocated_by_supplier[s.id]
-
-        # 2) Rotation fairness update
-        for s in suppliers:
-            if allocated_by_supplier[s.id] > 0:
-                s.rot_wait = 0
-            else:
-                s.rot_wait += 1
-
-            # lower is better (not selected recently -> smaller value)
-            s.F_rot = 1.0 / (1.0 + s.rot_wait)
-
-        # 3) Disparity fairness update (H_s / E_s)
-        total_Q = sum(s.Q for s in suppliers)
-        total_Cap = sum(s.cap_nominal for s in suppliers)
-
-        # If no history yet, start neutral
-        if total_Q <= self.eps or total_Cap <= self.eps:
-            for s in suppliers:
-                s.F_disp = 1.0
-        else:
-            for s in suppliers:
-                H_s = s.Q / (total_Q + self.eps)
-                E_s = s.cap_nominal / (total_Cap + self.eps)
-
-                ratio = H_s / (E_s + self.eps)
-
-                # cap to avoid extreme values dominating the score
-                ratio = max(self.eps, min(self.disp_cap, ratio))
-
-                s.F_disp = ratio
-
-        # 4) Unified fairness signal
-        for s in suppliers:
-            s.F_unified = self.delta * s.F_rot + (1.0 - self.delta) * s.F_disp
-            #s.F_unified = s.F_rot  # temporary until disparity is implemented
+        """alloc: this timestep's allocated quantity per supplier index."""
+        # Q_s, rotation (r_s, F^rot), disparity (H_s / E_s, capped) and unified F_s
+        _kernels.update_fairness(
+            alloc, arrays.Q, arrays.rot_wait,
+            arrays.F_rot, arrays.F_disp, arrays.F_unified,
+            arrays.cap_nominal, self.delta, self.eps, self.disp_cap, np.empty(len(alloc)),
+        )
 
 
 # =========================
@@ -171,37 +206,34 @@ class FairnessModule:
 class PolicyScoringModule:
     def __init__(self, scenario: ScenarioConfig):
         self.scenario = scenario
+        # scenario scalars read once, passed straight to the kernels
+        self._tau = scenario.tau
+        self._w_c = scenario.w_c
+        self._w_e = scenario.w_e
+        # fairness term weight actually applied: zero when fairness is disabled
+        self._w_f = scenario.w_f if scenario.use_fairness else 0.0
 
     def carbon_adjusted_cost(self, base_cost: float, co2: float) -> float:
         """c'_s = c_s + τ * CO2_s"""
-        return base_cost + self.scenario.tau * co2
-
-    @staticmethod
-    def _minmax(vals, eps=1e-9):
-        vmin, vmax = min(vals), max(vals)
-        denom = (vmax - vmin) + eps
-        return [(v - vmin) / denom for v in vals]
-
-    def compute_scores(self, suppliers, buyer):
-        w_c, w_e, w_f = self.scenario.w_c, self.scenario.w_e, self.scenario.w_f
-
-        c_primes = [self.carbon_adjusted_cost(s.c, s.co2) for s in suppliers]
-        co2s = [s.co2 for s in suppliers]
-
-        if self.scenario.use_fairness:
-            fs = [s.F_unified for s in suppliers]
-            fN = self._minmax(fs)
-        else:
-            fN = [0.0 for _ in suppliers]
-
-        cN = self._minmax(c_primes)
-        eN = self._minmax(co2s)
+        return base_cost + self._tau * co2
 
-        scores = {}
-        for s, cn, en, fn in zip(suppliers, cN, eN, fN):
-            scores[s.id] = w_c * cn + w_e * en + w_f * fn
-
-        return scores
+    def compute_scores(
+        self,
+        arrays: SupplierArrays,
+        idx: np.ndarray,
+        c_prime: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Scores for the suppliers at indices `idx`, aligned with `idx` (lower is better)."""
+        w_c, w_e, w_f = self._w_c, self._w_e, self._w_f
+        if c_prime is None:
+            c_prime = self.carbon_adjusted_cost(arrays.c, arrays.co2)
+        elif len(c_prime) != len(arrays.c):
+            # the kernel indexes c_prime by supplier index without bounds checks
+            raise ValueError(f"c_prime has {len(c_prime)} entries for {len(arrays.c)} suppliers")
+        return _kernels.compute_scores(
+            c_prime, arrays.co2, arrays.F_unified, idx,
+            w_c, w_e, w_f, 1e-9, np.empty(len(idx)),
+        )
 
 
 """
@@ -253,107 +285,102 @@ class MarketplaceModule:
         self.env = env_module
         self.fairness = fairness_module
         self.policy = policy_module
-
-    def refresh_state(self, suppliers: List[Supplier], buyers: List[Buyer]):
+        # per-supplier constants for the current timestep, set by refresh_state
+        # (valid for the SupplierArrays it was last called with)
+        self._arrays: Optional[SupplierArrays] = None
+        self._co2: Optional[np.ndarray] = None
+        self._c_prime: Optional[np.ndarray] = None
+        self._trans_per_unit: Optional[np.ndarray] = None
+
+    def refresh_state(self, arrays: SupplierArrays, buyers: List[Buyer]):
         """Reset capacities and demands at the start of each timestep."""
-        for s in suppliers:
-            s.reset_capacity()
+        arrays.cap_available[:] = arrays.cap_nominal
         for b in buyers:
             b.reset_demand()
 
+        # c'_s and d_sb * co2_per_km, shared by scoring, emissions and cost
+        self._arrays = arrays
+        self._co2 = arrays.co2
+        self._c_prime = self.policy.carbon_adjusted_cost(arrays.c, arrays.co2)
+        self._trans_per_unit = arrays.dist * self.env.co2_per_km
+
     def filter_suppliers(
         self,
-        suppliers: List[Supplier],
-    ) -> List[Supplier]:
+        arrays: SupplierArrays,
+    ) -> np.ndarray:
         """Apply basic feasibility: capacity > 0, plus any scenario-specific rules."""
-        eligible = [s for s in suppliers if s.cap_available > 0]
+        eligible = np.flatnonzero(arrays.cap_available > 0)
         # TODO: apply scenario-specific exclusions if needed
         return eligible
 
+    def _cached_c_prime(self, arrays: SupplierArrays) -> Optional[np.ndarray]:
+        """c'_s from refresh_state if it was computed for `arrays`, else None (scorer computes it)."""
+        return self._c_prime if arrays is self._arrays else None
+
+    def _check_refreshed(self, alloc: np.ndarray) -> None:
+        if self._c_prime is None:
+            raise RuntimeError("MarketplaceModule.refresh_state() must be called before computing emissions or cost")
+        if len(alloc) != len(self._c_prime):
+            raise ValueError(
+                f"alloc has {len(alloc)} entries but the refreshed suppliers number {len(self._c_prime)}"
+            )
+
     def rank_suppliers(
         self,
-        suppliers: List[Supplier],
+        arrays: SupplierArrays,
+        eligible: np.ndarray,
         buyer: Buyer
-    ) -> List[Supplier]:
-        """Compute scores and return suppliers sorted by ascending score."""
-        scores = self.policy.compute_scores(suppliers, buyer)
-        ranked = sorted(suppliers, key=lambda s: scores[s.id])
-        return ranked
+    ) -> np.ndarray:
+        """Compute scores and return supplier indices sorted by ascending score (stable on ties)."""
+        scores = self.policy.compute_scores(arrays, eligible, self._cached_c_prime(arrays))
+        return eligible[np.argsort(scores, kind="mergesort")]
 
     def allocate_sequential(
         self,
-        ranked_suppliers: List[Supplier],
+        arrays: SupplierArrays,
+        ranked: np.ndarray,
         buyer: Buyer
-    ) -> Dict[Tuple[str, str], float]:
+    ) -> np.ndarray:
         """
         Sequential allocation:
         q_{sb,t} = min(D_b, Cap_s)
+        Returns the allocated quantity per supplier index.
         """
-        allocations: Dict[Tuple[str, str], float] = {}
-        for s in ranked_suppliers:
-            if buyer.demand_remaining <= 0:
-                break
-            if s.cap_available <= 0:
-                continue
-
-            q = min(buyer.demand_remaining, s.cap_available)
-            allocations[(s.id, buyer.id)] = q
-            s.cap_available -= q
-            buyer.demand_remaining -= q
-
-        return allocations
+        alloc = np.zeros(len(arrays.ids))
+        buyer.demand_remaining = _kernels.allocate_sequential(
+            ranked, arrays.cap_available, buyer.demand_remaining, alloc,
+        )
+        return alloc
 
     def allocate_proportional(
         self,
-        eligible_suppliers: List[Supplier],
+        arrays: SupplierArrays,
+        eligible: np.ndarray,
         buyer: Buyer
-    ) -> Dict[Tuple[str, str], float]:
+    ) -> np.ndarray:
         """
         Proportional allocation based on score-derived weights.
         Example: weight_s = 1 / Score_s.
+        Shares cut by capacity are redistributed, first to the score-0 supplier
+        that gets no weight in the first pass; any remainder stays in
+        buyer.demand_remaining. Returns the allocated quantity per supplier index.
         """
-        allocations: Dict[Tuple[str, str], float] = {}
-
-        scores = self.policy.compute_scores(eligible_suppliers, buyer)
-        # TODO: may want to protect against zero or negative scores
-        weights = {}
-        for s in eligible_suppliers:
-            # simple inverse-score weight (you can refine this)
-            w = 1.0 / scores[s.id] if scores[s.id] > 0 else 0.0
-            weights[s.id] = w
-
-        total_w = sum(weights.values())
-        if total_w == 0:
-            return allocations  # no meaningful proportional allocation
-
-        for s in eligible_suppliers:
-            share = weights[s.id] / total_w
-            q = share * buyer.demand_remaining
-            q = min(q, s.cap_available)
-            allocations[(s.id, buyer.id)] = q
-            s.cap_available -= q
-
-        buyer.demand_remaining = 0.0
-        return allocations
-
-    def compute_emissions(
-        self,
-        suppliers: List[Supplier],
-        buyer: Buyer,
-        allocations: Dict[Tuple[str, str], float]
-    ) -> Dict[str, float]:
+        scores = self.policy.compute_scores(arrays, eligible, self._cached_c_prime(arrays))
+        alloc = np.zeros(len(arrays.ids))
+        m = len(eligible)
+        buyer.demand_remaining = _kernels.allocate_proportional(
+            scores, eligible, arrays.cap_available, buyer.demand_remaining, alloc,
+            np.empty(m), np.empty(m), np.empty(m),
+        )
+        return alloc
+
+    def compute_emissions(self, alloc: np.ndarray) -> Dict[str, float]:
         """
         Compute CO2^{prod}_t, CO2^{trans}_t, CO2_total,t.
         """
-        co2_prod = 0.0
-        co2_trans = 0.0
-
-        for (sid, bid), q in allocations.items():
-            s = next(sp for sp in suppliers if sp.id == sid)
-            co2_prod += q * s.co2
-
-            d_sb = self.env.get_distance(s, buyer)
-            co2_trans += d_sb * self.env.co2_per_km * q
+        self._check_refreshed(alloc)
+        co2_prod = float(alloc @ self._co2)
+        co2_trans = float(alloc @ self._trans_per_unit)
 
         co2_total = co2_prod + co2_trans
         return {
@@ -361,23 +388,23 @@ class MarketplaceModule:
             "CO2_trans": co2_trans,
             "CO2_total": co2_total,
         }
-    def compute_cost_total(
-        self,
-        suppliers: List[Supplier],
-        allocations: Dict[Tuple[str, str], float],
-    ) -> float:
+
+    def compute_cost_total(self, alloc: np.ndarray) -> float:
         """
         Total procurement cost for the timestep:
         sum_{(s,b)} q_{sb,t} * (c_s + tau*CO2_s)
         """
-        total = 0.0
-        supplier_map = {s.id: s for s in suppliers}
-        for (sid, _), q in allocations.items():
-            s = supplier_map[sid]
-            c_prime = self.policy.carbon_adjusted_cost(s.c, s.co2)
-            total += float(q) * c_prime
-        return total
+        self._check_refreshed(alloc)
+        return float(alloc @ self._c_prime)
+
+
+def alloc_to_dict(alloc: np.ndarray, suppliers: List[Supplier], buyer: Buyer) -> Dict[Tuple[str, str], float]:
+    """Dense per-supplier allocation vector as {(supplier_id, buyer_id): q}, nonzero entries only."""
+    return _alloc_items(alloc, [s.id for s in suppliers], buyer.id)
+
 
+def _alloc_items(alloc: np.ndarray, supplier_ids: List[str], buyer_id: str) -> Dict[Tuple[str, str], float]:
+    return {(supplier_ids[i], buyer_id): float(alloc[i]) for i in np.flatnonzero(alloc)}
 
 
 # =========================
@@ -413,35 +440,75 @@ class Logger:
         })
 """
 class Logger:
-    def __init__(self):
-        self.allocations_per_t: List[Dict[Tuple[str, str], float]] = []
-        self.emissions_per_t: List[Dict[str, float]] = []
-        self.cost_total_per_t: List[float] = []
-        self.allocated_total_per_t: List[float] = []
-        self.fairness_snapshots: List[Dict[str, Dict[str, float]]] = []
+    def __init__(self, T: int, supplier_ids: List[str]):
+        """
+        T: number of timesteps; per-step series are preallocated arrays
+           written by index (row t-1 holds timestep t).
+        supplier_ids: supplier ids in simulation order (the N axis below).
+        """
+        self.supplier_ids = list(supplier_ids)
+        self.sid2ix = {sid: i for i, sid in enumerate(self.supplier_ids)}
+        N = len(self.supplier_ids)
+        self.n_steps = 0              # number of timesteps recorded so far
+
+        self.alloc_TN = np.zeros((T, N))
+        self.emissions_T3 = np.empty((T, 3))      # CO2_prod, CO2_trans, CO2_total
+        self.cost_T = np.empty(T)
+        self.fairness = np.empty((T, N, 4))       # Q, F_rot, F_disp, F_unified
+
+        # named views on the emission columns
+        self.co2_prod = self.emissions_T3[:, 0]
+        self.co2_trans = self.emissions_T3[:, 1]
+        self.co2_total = self.emissions_T3[:, 2]
+        self.cost_total = self.cost_T
+
+    @property
+    def allocated_total(self) -> np.ndarray:
+        """Total quantity allocated per timestep."""
+        return self.alloc_TN.sum(axis=1)
 
     def record(
         self,
         t: int,
-        allocations: Dict[Tuple[str, str], float],
-        suppliers: List[Supplier],
-        emissions: Dict[str, float],
+        alloc: np.ndarray,
+        fairness: np.ndarray,
+        emissions: Union[Dict[str, float], np.ndarray],
         cost_total: float,
     ):
-        self.allocations_per_t.append(dict(allocations))
-        self.emissions_per_t.append(dict(emissions))
-        self.cost_total_per_t.append(float(cost_total))
-        self.allocated_total_per_t.append(sum(float(q) for q in allocations.values()))
+        """
+        alloc: (N,) quantities in supplier order.
+        fairness: (N, 4) rows of Q, F_rot, F_disp, F_unified
+           (SupplierArrays.fairness_snapshot()).
+        emissions: the MarketplaceModule.compute_emissions dict, or the
+           values CO2_prod, CO2_trans, CO2_total in that order.
+        """
+        if isinstance(emissions, dict):
+            emissions = (emissions["CO2_prod"], emissions["CO2_trans"], emissions["CO2_total"])
+        i = t - 1
+        self.alloc_TN[i] = alloc
+        self.fairness[i] = fairness
+        self.emissions_T3[i] = emissions
+        self.cost_T[i] = cost_total
+        self.n_steps = max(self.n_steps, t)
+
+    def record_run(
+        self,
+        alloc: np.ndarray,
+        fairness: np.ndarray,
+        emissions: np.ndarray,
+        cost_total: np.ndarray,
+    ):
+        """Record timesteps 1..len(alloc) at once (same layouts as record, stacked over t)."""
+        n = alloc.shape[0]
+        self.alloc_TN[:n] = alloc
+        self.fairness[:n] = fairness
+        self.emissions_T3[:n] = emissions
+        self.cost_T[:n] = cost_total
+        self.n_steps = max(self.n_steps, n)
 
-        self.fairness_snapshots.append({
-            s.id: {
-                "Q": s.Q,
-                "F_rot": s.F_rot,
-                "F_disp": s.F_disp,
-                "F_unified": s.F_unified,
-            }
-            for s in suppliers
-        })
+    def allocations_as_dict(self, t: int, buyer_id: str) -> Dict[Tuple[str, str], float]:
+        """Allocations of timestep t as {(supplier_id, buyer_id): q}, nonzero entries only."""
+        return _alloc_items(self.alloc_TN[t - 1], self.supplier_ids, buyer_id)
 
 
 # =========================
@@ -470,46 +537,101 @@ class Simulation:
         self.logger = logger
         self.scenario = scenario
 
+        # per-step state lives in arrays; suppliers are synced at the end of run()
+        self.arrays = SupplierArrays.from_suppliers(suppliers, buyers[0])
+        # Supplier CO2 values (static or individualized) are constant across the run
+        self.arrays.co2[:] = env_module.co2_vector(suppliers, scenario)
+
     def run(self):
-        T = self.scenario.T
         buyer = self.buyers[0]  # single representative buyer
+        arrays = self.arrays
+
+        # Scenario and module scalars, read once and handed to the kernel as plain values
+        sc = self.scenario
+        T, tau, w_c, w_e, w_f, use_fairness = sc.T, sc.tau, sc.w_c, sc.w_e, sc.w_f, sc.use_fairness
+        delta, eps, disp_cap = self.fairness.delta, self.fairness.eps, self.fairness.disp_cap
+        co2_per_km = self.env.co2_per_km
+
+        # Whole run in one compiled kernel: refresh -> filter -> score/rank ->
+        # allocate -> fairness -> emissions/cost, for every timestep
+        run_kernel = _kernels.run_sequential if sc.allocation_mode == "sequential" else _kernels.run_proportional
+        alloc, emissions, cost, fairness, buyer.demand_remaining = run_kernel(
+            arrays.c, arrays.co2, arrays.cap_nominal, arrays.cap_available, arrays.dist,
+            arrays.Q, arrays.rot_wait, arrays.F_rot, arrays.F_disp, arrays.F_unified,
+            buyer.demand_nominal, tau, w_c, w_e, w_f,
+            delta, use_fairness, co2_per_km, eps, disp_cap, T,
+        )
 
-        for t in range(1, T + 1):
-            # 1) Refresh capacities and demand
-            self.marketplace.refresh_state(self.suppliers, self.buyers)
-
-            # 2) Update supplier CO2 values (static or individualized)
-            for s in self.suppliers:
-                s.co2 = self.env.get_co2(s, self.scenario)
-
-            # 3) Filtering
-            eligible = self.marketplace.filter_suppliers(self.suppliers)
-
-            # 4) Allocation
-            if self.scenario.allocation_mode == "sequential":
-                ranked = self.marketplace.rank_suppliers(eligible, buyer)
-                allocations = self.marketplace.allocate_sequential(ranked, buyer)
-            else:
-                allocations = self.marketplace.allocate_proportional(eligible, buyer)
-
-            # 5) Fairness update (only if enabled)
-            if self.scenario.use_fairness:
-                self.fairness.update_fairness(self.suppliers, allocations)
-            else:
-                # keep fairness neutral so scoring behaves like "no fairness"
-                for s in self.suppliers:
-                    s.F_rot = 1.0
-                    s.F_disp = 1.0
-                    s.F_unified = 1.0
+        self.logger.record_run(alloc, fairness, emissions, cost)
+
+        arrays.write_back(self.suppliers)
+
+
+def batch_group(scenario: ScenarioConfig) -> Tuple[str, int]:
+    """Scenarios with equal batch_group() share one kernel call in run_batched."""
+    return scenario.allocation_mode, scenario.T
+
+
+def run_batched(
+    scenarios: List[ScenarioConfig],
+    suppliers: List[Supplier],
+    buyer: Buyer,
+    env_module: EnvironmentalDataModule,
+    eps: float = 1e-9,
+    disp_cap: float = 5.0,
+) -> List[Tuple[List[Supplier], Logger]]:
+    """
+    Run several scenarios on the same supplier set and buyer.
+    Scenarios sharing an allocation mode and horizon T are advanced together by
+    one kernel call; results match running each through Simulation.
+    Returns (suppliers, logger) per scenario, in input order; each run gets its
+    own copy of `suppliers` with the final state written back.
+    """
+    base = SupplierArrays.from_suppliers(suppliers, buyer)
+    results: List[Optional[Tuple[List[Supplier], Logger]]] = [None] * len(scenarios)
+
+    groups: Dict[Tuple[str, int], List[int]] = {}
+    for k, sc in enumerate(scenarios):
+        groups.setdefault(batch_group(sc), []).append(k)
+
+    for (mode, T), members in groups.items():
+        S = len(members)
+        batch = [scenarios[k] for k in members]
+
+        def stacked(a: np.ndarray) -> np.ndarray:
+            return np.tile(a, (S, 1))
+
+        co2 = np.stack([env_module.co2_vector(suppliers, sc) for sc in batch])
+        cap_available = stacked(base.cap_available)
+        Q = stacked(base.Q)
+        rot_wait = stacked(base.rot_wait)
+        F_rot = stacked(base.F_rot)
+        F_disp = stacked(base.F_disp)
+        F_unified = stacked(base.F_unified)
+
+        def param(name: str) -> np.ndarray:
+            return np.array([getattr(sc, name) for sc in batch], dtype=np.float64)
+
+        alloc, emissions, cost, fairness, _ = _kernels.run_batched(
+            base.c, co2, base.cap_nominal, cap_available, base.dist,
+            Q, rot_wait, F_rot, F_disp, F_unified,
+            buyer.demand_nominal, param("tau"), param("w_c"), param("w_e"), param("w_f"), param("delta"),
+            np.array([sc.use_fairness for sc in batch]), env_module.co2_per_km,
+            eps, disp_cap, T, mode == "sequential",
+        )
 
-            # 6) Emission calculation
-            emissions = self.marketplace.compute_emissions(self.suppliers, buyer, allocations)
+        for j, k in enumerate(members):
+            run_suppliers = copy.deepcopy(suppliers)
+            replace(
+                base, co2=co2[j], cap_available=cap_available[j], Q=Q[j], rot_wait=rot_wait[j],
+                F_rot=F_rot[j], F_disp=F_disp[j], F_unified=F_unified[j],
+            ).write_back(run_suppliers)
 
-            # 6b) Cost calculation
-            cost_total = self.marketplace.compute_cost_total(self.suppliers, allocations)
+            logger = Logger(T=T, supplier_ids=base.ids)
+            logger.record_run(alloc[j], fairness[j], emissions[j], cost[j])
+            results[k] = (run_suppliers, logger)
 
-            # 7) Logging
-            self.logger.record(t, allocations, self.suppliers, emissions, cost_total)
+    return results
 
 
 # =========================
@@ -536,14 +658,27 @@ def create_example_suppliers() -> List[Supplier]:
     return suppliers
 """
 
-def create_suppliers_ABC() -> List[Supplier]:
+def create_suppliers_ABC(rng: Optional[random.Random] = None) -> List[Supplier]:
+    """
+    rng: private random.Random used for the supplier-buyer distances;
+         None draws from the module-level `random` state.
+    """
+    uniform = rng.uniform if rng is not None else random.uniform
     suppliers: List[Supplier] = []
     buyer_ids = ["B1"]
 
+    # All supplier-buyer distances in one draw, in the same order as before
+    # (supplier A1..C3, then buyer), so a given seed yields the same values
+    nb = len(buyer_ids)
+    draws = [uniform(50, 300) for _ in range(9 * nb)]
+
+    def distances_for(k: int) -> Dict[str, float]:
+        return dict(zip(buyer_ids, draws[k * nb:(k + 1) * nb]))
+
     # Type A: high cost, low CO2
     for i in range(3):
         s_id = f"A{i+1}"
-        distances = {b: random.uniform(50, 300) for b in buyer_ids}
+        distances = distances_for(i)
         suppliers.append(
             Supplier(
                 id=s_id,
@@ -557,7 +692,7 @@ def create_suppliers_ABC() -> List[Supplier]:
     # Type B: medium cost, medium CO2
     for i in range(3):
         s_id = f"B{i+1}"
-        distances = {b: random.uniform(50, 300) for b in buyer_ids}
+        distances = distances_for(3 + i)
         suppliers.append(
             Supplier(
                 id=s_id,
@@ -571,7 +706,7 @@ def create_suppliers_ABC() -> List[Supplier]:
     # Type C: low cost, high CO2
     for i in range(3):
         s_id = f"C{i+1}"
-        distances = {b: random.uniform(50, 300) for b in buyer_ids}
+        distances = distances_for(6 + i)
         suppliers.append(
             Supplier(
                 id=s_id,
@@ -585,6 +720,22 @@ def create_suppliers_ABC() -> List[Supplier]:
     return suppliers
 
 
+# Supplier groups, identified by the first letter of the supplier id
+SUPPLIER_GROUPS: Tuple[str, ...] = ("A", "B", "C")
+
+
+def supplier_group_index(suppliers: List[Supplier]) -> np.ndarray:
+    """
+    Dense group index aligned with `suppliers` (A=0, B=1, C=2).
+    Ids outside SUPPLIER_GROUPS map to len(SUPPLIER_GROUPS).
+    """
+    lookup = {g: i for i, g in enumerate(SUPPLIER_GROUPS)}
+    return np.array(
+        [lookup.get(s.id[:1].upper(), len(SUPPLIER_GROUPS)) for s in suppliers],
+        dtype=np.int8,
+    )
+
+
 def create_example_buyer() -> Buyer:
     return Buyer(
         id="B1",
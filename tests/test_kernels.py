@@ -0,0 +1,65 @@
+"""Checks for the allocation kernels in _kernels.py."""
+import numpy as np
+
+import _kernels
+
+
+def _proportional(scores, cap, demand):
+    n = len(scores)
+    idx = np.arange(n, dtype=np.int64)
+    cap_available = np.array(cap, dtype=np.float64)
+    alloc = np.zeros(n)
+    unmet = _kernels.allocate_proportional(
+        np.array(scores, dtype=np.float64), idx, cap_available, demand, alloc,
+        np.empty(n), np.empty(n), np.empty(n),
+    )
+    return alloc, cap_available, unmet
+
+
+def test_proportional_uncapped_is_single_pass():
+    scores = [0.0, 0.4, 1.0]
+    alloc, _, unmet = _proportional(scores, [100.0, 100.0, 100.0], 90.0)
+    w = np.array([0.0, 1 / 0.4, 1.0])
+    np.testing.assert_allclose(alloc, w / w.sum() * 90.0)
+    assert unmet == 0.0
+
+
+def test_proportional_capacity_bound_redistributes_to_best_supplier():
+    # Best supplier scores 0 and gets nothing in the first pass; the others
+    # hit their caps, so the remainder has to go to the best supplier.
+    alloc, cap_left, unmet = _proportional([0.0, 0.1, 1.0], [100.0, 100.0, 100.0], 250.0)
+    assert unmet == 0.0
+    assert abs(alloc.sum() - 250.0) < 1e-9
+    assert np.all(alloc <= 100.0) and np.all(cap_left >= 0.0)
+    assert alloc[0] > 0.0
+
+
+def test_proportional_reports_unmet_demand_beyond_total_capacity():
+    alloc, cap_left, unmet = _proportional([0.0, 0.5, 1.0], [100.0, 100.0, 100.0], 400.0)
+    np.testing.assert_allclose(alloc, [100.0, 100.0, 100.0])
+    assert abs(unmet - 100.0) < 1e-9
+    assert np.all(cap_left == 0.0)
+
+
+def test_sequential_lazy_matches_stable_sort():
+    # Few distinct scores so ties are common: the lazy picker has to break
+    # them in index order, like the stable (mergesort) argsort it replaces.
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        n = int(rng.integers(1, 15))
+        idx = np.sort(rng.choice(20, n, replace=False)).astype(np.int64)
+        scores = rng.integers(0, 4, n).astype(np.float64)
+        cap = np.zeros(20)
+        cap[idx] = rng.uniform(0, 50, n)
+        demand = float(rng.uniform(0, 400))
+
+        alloc_ref, cap_ref = np.zeros(20), cap.copy()
+        unmet_ref = _kernels.allocate_sequential(
+            idx[np.argsort(scores, kind="mergesort")], cap_ref, demand, alloc_ref)
+        alloc_lazy, cap_lazy = np.zeros(20), cap.copy()
+        unmet_lazy = _kernels.allocate_sequential_lazy(
+            scores, idx, cap_lazy, demand, alloc_lazy, np.empty(n, dtype=np.bool_))
+
+        assert unmet_lazy == unmet_ref
+        assert np.array_equal(alloc_lazy, alloc_ref)
+        assert np.array_equal(cap_lazy, cap_ref)
@@ -0,0 +1,67 @@
+"""The per-step module API, chained by hand, reproduces Simulation.run."""
+import random
+
+import numpy as np
+
+from run_experiments import DISP_CAP, FAIRNESS_EPS, make_environment
+from scenarios import SCENARIOS
+from simulation import (
+    FairnessModule,
+    Logger,
+    MarketplaceModule,
+    PolicyScoringModule,
+    Simulation,
+    create_example_buyer,
+    create_suppliers_ABC,
+)
+
+
+def _simulation(key):
+    scenario = SCENARIOS[key]
+    suppliers = create_suppliers_ABC(rng=random.Random(42))
+    env = make_environment()
+    fairness = FairnessModule(delta=scenario.delta, eps=FAIRNESS_EPS, disp_cap=DISP_CAP)
+    policy = PolicyScoringModule(scenario)
+    return Simulation(
+        suppliers=suppliers,
+        buyers=[create_example_buyer()],
+        env_module=env,
+        fairness_module=fairness,
+        policy_module=policy,
+        marketplace=MarketplaceModule(env, fairness, policy),
+        logger=Logger(T=scenario.T, supplier_ids=[s.id for s in suppliers]),
+        scenario=scenario,
+    )
+
+
+def _run_by_steps(sim):
+    sc, arrays, buyer, market = sim.scenario, sim.arrays, sim.buyers[0], sim.marketplace
+    if not sc.use_fairness:
+        arrays.F_rot[:] = arrays.F_disp[:] = arrays.F_unified[:] = 1.0
+
+    for t in range(1, sc.T + 1):
+        market.refresh_state(arrays, sim.buyers)
+        eligible = market.filter_suppliers(arrays)
+        if sc.allocation_mode == "sequential":
+            alloc = market.allocate_sequential(arrays, market.rank_suppliers(arrays, eligible, buyer), buyer)
+        else:
+            alloc = market.allocate_proportional(arrays, eligible, buyer)
+        if sc.use_fairness:
+            sim.fairness.update_fairness(arrays, alloc)
+        sim.logger.record(
+            t, alloc, arrays.fairness_snapshot(),
+            market.compute_emissions(alloc), market.compute_cost_total(alloc),
+        )
+
+
+def test_step_api_matches_run():
+    for key in SCENARIOS:
+        stepped, whole = _simulation(key), _simulation(key)
+        _run_by_steps(stepped)
+        whole.run()
+        a, b = stepped.logger, whole.logger
+        assert a.n_steps == b.n_steps
+        assert np.array_equal(a.alloc_TN, b.alloc_TN), key
+        assert np.array_equal(a.fairness, b.fairness), key
+        np.testing.assert_allclose(a.emissions_T3, b.emissions_T3, rtol=1e-12)
+        np.testing.assert_allclose(a.cost_T, b.cost_T, rtol=1e-12)